@@ -1,5 +1,6 @@
 import threading
 import random
+import numpy as np
 
 # Core Physics Concepts
 class ConstantBalancer:
@@ -20,6 +21,10 @@ class QuantumTransformation:
     def transform(self, state, force):
         return [x * (1 + force) for x in state]
 
+    def transform_batch(self, state, forces):
+        # One (F, len(state)) broadcast instead of a transform() call per force
+        return np.asarray(state)[None, :] * (1 + np.asarray(forces))[:, None]
+
 class ActionPotential:
     def calculate(self, initial, potential, action):
         return initial + potential - action
@@ -40,14 +45,25 @@ class MassIncreaseSolution:
 
 # Formula Application Utility
 class FormulaEngine:
+    SPEED_OF_LIGHT = 299792458
+
     def emc2(self, energy, mass):
-        c = 299792458
+        c = self.SPEED_OF_LIGHT
         return energy / (mass * c**2 + 1e-10)
 
     def quantum_field_mapping(self, user_input, quantum_state):
         result = quantum_state + 0.1 * user_input
         return result
 
+    # Specialized closures for repeated calls with a fixed second argument
+    def make_emc2(self, mass):
+        c = self.SPEED_OF_LIGHT
+        denominator = mass * c**2 + 1e-10
+        return lambda energy: energy / denominator
+
+    def make_quantum_field_mapping(self, quantum_state):
+        return lambda user_input: quantum_state + 0.1 * user_input
+
 # Adaptive Field Engine for dynamic spatial force calculations
 class AdaptiveFieldEngine:
     def __init__(self, grid_shape):
@@ -104,6 +120,55 @@ class UserInteractionForceModule:
         self.last_force = force
         return force
 
+# Batched quantum rollout - advances B independent systems through every frame
+def _quantum_rollout_py(mass, energy, state, pos_z, forces, time_delta,
+                        out_mass, out_energy, out_pos_z, out_state_x):
+    """Apply forces.shape[1] update_physics steps to each of B systems
+
+    mass, energy and pos_z have shape (B,), state (B, 3), forces and out_* (B, n_frames).
+    Per-system scalars stay in locals across frames; only the histories and the
+    final state are written back.
+    """
+    for b in range(mass.shape[0]):
+        m = mass[b]
+        e = energy[b]
+        z = pos_z[b]
+        for t in range(forces.shape[1]):
+            m = m + 0.2 * e
+            e = e * (1 + 0.01 * time_delta)
+            for k in range(state.shape[1]):
+                state[b, k] = state[b, k] * (1 + forces[b, t])
+            z += forces[b, t] * 0.1
+            out_mass[b, t] = m
+            out_energy[b, t] = e
+            out_pos_z[b, t] = z
+            out_state_x[b, t] = state[b, 0]
+        mass[b] = m
+        energy[b] = e
+        pos_z[b] = z
+
+_quantum_rollout_kernel = None
+
+def quantum_rollout(*args):
+    """Run _quantum_rollout_py, compiling it with Numba on first use
+
+    numba is imported here rather than at module level so importing
+    ParallelPhysics stays cheap for callers that never touch the kernel.
+    cache=True keeps the compiled kernel on disk so later processes skip the
+    JIT; the loop stays serial because the only caller evolves a single system
+    and a parallel loop would pay the threading-layer startup for nothing.
+    Without numba the plain Python loops run instead.
+    """
+    global _quantum_rollout_kernel
+    if _quantum_rollout_kernel is None:
+        try:
+            from numba import njit
+        except ImportError:  # numba is optional
+            _quantum_rollout_kernel = _quantum_rollout_py
+        else:
+            _quantum_rollout_kernel = njit(cache=True, fastmath=True)(_quantum_rollout_py)
+    _quantum_rollout_kernel(*args)
+
 # Quantum Physics Improvement - master class linking components
 class QuantumPhysicsImprovement:
     def __init__(self, obj, mass=1.0, energy=10.0, grid_shape=(10,10,10)):
@@ -141,7 +206,7 @@ class QuantumPhysicsImprovement:
         efficiency = self.efficiency_manager.optimize_resources()
 
         # Update object's arbitrary properties for demo
-        self.obj.location.z += force * 0.1
+        self.obj.location[2] += force * 0.1  # location is an (x, y, z) ndarray
         self.mass = mass_updated
         self.energy = evolved_energy
         self.state = new_state
@@ -21,6 +21,10 @@ class QuantumTransformation:
     def transform(self, state, force):
         return [x * (1 + force) for x in state]
 
+    def transform_batch(self, state, forces):
+        # One (F, len(state)) broadcast instead of a transform() call per force
+        return np.asarray(state)[None, :] * (1 + np.asarray(forces))[:, None]
+
 class ActionPotential:
     def calculate(self, initial, potential, action):
         return initial + potential - action
@@ -41,14 +45,25 @@ class MassIncreaseSolution:
 
 # Formula Application Utility
 class FormulaEngine:
+    SPEED_OF_LIGHT = 299792458
+
     def emc2(self, energy, mass):
-        c = 299792458
+        c = self.SPEED_OF_LIGHT
         return energy / (mass * c**2 + 1e-10)
 
     def quantum_field_mapping(self, user_input, quantum_state):
         result = quantum_state + 0.1 * user_input
         return result
 
+    # Specialized closures for repeated calls with a fixed second argument
+    def make_emc2(self, mass):
+        c = self.SPEED_OF_LIGHT
+        denominator = mass * c**2 + 1e-10
+        return lambda energy: energy / denominator
+
+    def make_quantum_field_mapping(self, quantum_state):
+        return lambda user_input: quantum_state + 0.1 * user_input
+
 # Adaptive Field Engine for dynamic spatial force calculations
 class AdaptiveFieldEngine:
     def __init__(self, grid_shape):
@@ -143,7 +158,7 @@ class QuantumPhysicsImprovement:
         efficiency = self.efficiency_manager.optimize_resources()
 
         # Update object's arbitrary properties for demo
-        self.obj.location.z += force * 0.1
+        self.obj.location[2] += force * 0.1  # location is an (x, y, z) ndarray
         self.mass = mass_updated
         self.energy = evolved_energy
         self.state = new_state
@@ -3,19 +3,16 @@ Test Script for ParallelPhysics.py
 Demonstrates all physics components and their functionality
 """
 
+import io
+import os
 import sys
 import threading
 import time
-import numpy as np  # Required for ParallelPhysics.py
+import numpy as np
 
-# IMPORTANT: Inject numpy into the module namespace before importing ParallelPhysics
-import importlib.util
-spec = importlib.util.spec_from_file_location("ParallelPhysics", 
-    r"c:\Users\irbaz\Downloads\Neural-Parallel-Physics-main\Neural-Parallel-Physics-main\ParallelPhysics.py")
-module = importlib.util.module_from_spec(spec)
-module.np = np  # Inject numpy before execution
-sys.modules['ParallelPhysics'] = module
-spec.loader.exec_module(module)
+# Make the sibling physics module importable regardless of the working directory
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import ParallelPhysics as module
 
 # Now import from the module
 ConstantBalancer = module.ConstantBalancer
@@ -30,25 +27,36 @@ FormulaEngine = module.FormulaEngine
 ParallelPhysicsProcessor = module.ParallelPhysicsProcessor
 UserInteractionForceModule = module.UserInteractionForceModule
 QuantumPhysicsImprovement = module.QuantumPhysicsImprovement
-
-
-def print_section(title):
+quantum_rollout = module.quantum_rollout
+
+# Shared component instances, created once and reused by every test
+BALANCER = ConstantBalancer()
+LINK = EnergyMassLink()
+EVOLUTION = EnergyEvolution()
+TRANSFORMER = QuantumTransformation()
+ACTION = ActionPotential()
+SURVIVAL = DynamicSurvival()
+DISPERSION = EnergyDispersionProblem()
+MASS_INCREASE = MassIncreaseSolution()
+ENGINE = FormulaEngine()
+UI_FORCE = UserInteractionForceModule()
+
+
+def print_section(title, file=None):
     """Print a formatted section header"""
-    print("\n" + "="*70)
-    print(f"  {title}")
-    print("="*70)
+    print("\n" + "="*70, file=file)
+    print(f"  {title}", file=file)
+    print("="*70, file=file)
 
 
 def test_constant_balancer():
     """Test the ConstantBalancer class"""
     print_section("TEST 1: CONSTANT BALANCER")
     
-    balancer = ConstantBalancer()
-    
     test_cases = [(10, 1), (20, 2), (50, 5)]
     
     for mass, const in test_cases:
-        result = balancer.balance(mass, const)
+        result = BALANCER.balance(mass, const)
         print(f"  Balance(mass={mass}, const={const}) = {result:.4f}")
 
 
@@ -56,12 +64,10 @@ def test_energy_mass_link():
     """Test the EnergyMassLink class"""
     print_section("TEST 2: ENERGY-MASS LINK")
     
-    link = EnergyMassLink()
-    
     test_cases = [(100, 5), (200, 10), (500, 20)]
     
     for energy, mass in test_cases:
-        correlation = link.correlation(energy, mass)
+        correlation = LINK.correlation(energy, mass)
         print(f"  Correlation(energy={energy}, mass={mass}) = {correlation:.4f}")
 
 
@@ -69,13 +75,11 @@ def test_energy_evolution():
     """Test the EnergyEvolution class"""
     print_section("TEST 3: ENERGY EVOLUTION")
     
-    evolution = EnergyEvolution()
-    
     initial_energy = 100.0
     print(f"  Initial Energy: {initial_energy:.4f}")
     
     for time_step in [1, 2, 5, 10]:
-        evolved = evolution.update(initial_energy, time_step)
+        evolved = EVOLUTION.update(initial_energy, time_step)
         print(f"  After {time_step} time units: {evolved:.4f}")
 
 
@@ -83,14 +87,12 @@ def test_quantum_transformation():
     """Test the QuantumTransformation class"""
     print_section("TEST 4: QUANTUM TRANSFORMATION")
     
-    transformer = QuantumTransformation()
-    
     state = [1.0, 1.0, 1.0]
     forces = [0.1, 0.5, 1.0]
     
     print(f"  Initial State: {state}")
-    for force in forces:
-        new_state = transformer.transform(state, force)
+    new_states = TRANSFORMER.transform_batch(state, forces)
+    for force, new_state in zip(forces, new_states):
         print(f"  After force={force}: {[f'{x:.4f}' for x in new_state]}")
 
 
@@ -98,12 +100,10 @@ def test_action_potential():
     """Test the ActionPotential class"""
     print_section("TEST 5: ACTION POTENTIAL")
     
-    action = ActionPotential()
-    
     test_cases = [(10, 5, 2), (20, 10, 5), (50, 25, 10)]
     
     for initial, potential, action_val in test_cases:
-        result = action.calculate(initial, potential, action_val)
+        result = ACTION.calculate(initial, potential, action_val)
         print(f"  Calculate({initial}, {potential}, {action_val}) = {result:.4f}")
 
 
@@ -111,12 +111,10 @@ def test_dynamic_survival():
     """Test the DynamicSurvival class"""
     print_section("TEST 6: DYNAMIC SURVIVAL")
     
-    survival = DynamicSurvival()
-    
     test_cases = [(10, 0.5), (20, 0.8), (50, 1.0)]
     
     for needs, adaptability in test_cases:
-        result = survival.evaluate(needs, adaptability)
+        result = SURVIVAL.evaluate(needs, adaptability)
         print(f"  Evaluate(needs={needs}, adaptability={adaptability}) = {result:.4f}")
 
 
@@ -124,8 +122,6 @@ def test_energy_dispersion():
     """Test the EnergyDispersionProblem class"""
     print_section("TEST 7: ENERGY DISPERSION")
     
-    dispersion = EnergyDispersionProblem()
-    
     energy_maps = [
         [10, 20, 30],
         [50, 50, 50],
@@ -133,7 +129,7 @@ def test_energy_dispersion():
     ]
     
     for energy_map in energy_maps:
-        result = dispersion.solve(energy_map)
+        result = DISPERSION.solve(energy_map)
         print(f"  Solve({energy_map}) = {[f'{x:.4f}' for x in result]}")
 
 
@@ -141,12 +137,10 @@ def test_mass_increase():
     """Test the MassIncreaseSolution class"""
     print_section("TEST 8: MASS INCREASE SOLUTION")
     
-    mass_inc = MassIncreaseSolution()
-    
     test_cases = [(50, 10), (100, 20), (200, 50)]
     
     for energy, mass in test_cases:
-        new_mass = mass_inc.apply(energy, mass)
+        new_mass = MASS_INCREASE.apply(energy, mass)
         print(f"  Apply(energy={energy}, mass={mass}) = new_mass: {new_mass:.4f}")
 
 
@@ -154,19 +148,21 @@ def test_formula_engine():
     """Test the FormulaEngine class"""
     print_section("TEST 9: FORMULA ENGINE")
     
-    engine = FormulaEngine()
-    
     print(f"  Testing E=mc² formula (normalized):")
     test_cases = [(100, 5), (200, 10), (500, 20)]
+    emc2_for_mass = {mass: ENGINE.make_emc2(mass) for _, mass in test_cases}
     
     for energy, mass in test_cases:
-        result = engine.emc2(energy, mass)
+        result = emc2_for_mass[mass](energy)
+        assert result == ENGINE.emc2(energy, mass)
         print(f"  E={energy}, m={mass}: {result:.4e}")
     
     print(f"\n  Testing Quantum Field Mapping:")
+    quantum_state = 10.0
+    field_mapping = ENGINE.make_quantum_field_mapping(quantum_state)
     for user_input in [0.5, 1.0, 2.0]:
-        quantum_state = 10.0
-        result = engine.quantum_field_mapping(user_input, quantum_state)
+        result = field_mapping(user_input)
+        assert result == ENGINE.quantum_field_mapping(user_input, quantum_state)
         print(f"  Input={user_input}, State={quantum_state}: {result:.4f}")
 
 
@@ -174,8 +170,6 @@ def test_user_interaction_force():
     """Test the UserInteractionForceModule class"""
     print_section("TEST 10: USER INTERACTION FORCE MODULE")
     
-    ui_force = UserInteractionForceModule()
-    
     input_vectors = [
         [0.5, 0.5, 0.5],
         [1.0, 2.0, 3.0],
@@ -183,63 +177,115 @@ def test_user_interaction_force():
     ]
     
     for input_vec in input_vectors:
-        force = ui_force.compute_force_from_input(input_vec)
+        force = UI_FORCE.compute_force_from_input(input_vec)
         print(f"  Input vector {input_vec} → Force: {force:.4f}")
 
 
 def test_quantum_physics_integration():
     """Test the integrated QuantumPhysicsImprovement class"""
-    print_section("TEST 11: INTEGRATED QUANTUM PHYSICS SYSTEM")
+    buf = io.StringIO()  # Flushed to stdout in one write at the end
+    print_section("TEST 11: INTEGRATED QUANTUM PHYSICS SYSTEM", file=buf)
     
     # Create a mock object
     class MockObject:
         def __init__(self):
-            self.location = type('obj', (object,), {'x': 0, 'y': 0, 'z': 0})()
+            self.location = np.zeros(3)  # x, y, z
     
     obj = MockObject()
     physics_system = QuantumPhysicsImprovement(obj, mass=10.0, energy=50.0)
     
-    print(f"  Initial Configuration:")
-    print(f"    └─ Mass: {physics_system.mass:.4f}")
-    print(f"    └─ Energy: {physics_system.energy:.4f}")
-    print(f"    └─ State Vector: {physics_system.state}")
-    print(f"    └─ Object Position Z: {obj.location.z:.4f}")
+    print(f"  Initial Configuration:", file=buf)
+    print(f"    └─ Mass: {physics_system.mass:.4f}", file=buf)
+    print(f"    └─ Energy: {physics_system.energy:.4f}", file=buf)
+    print(f"    └─ State Vector: {physics_system.state}", file=buf)
+    print(f"    └─ Object Position Z: {obj.location[2]:.4f}", file=buf)
     
-    print(f"\n  Running 5 Physics Updates:")
+    print(f"\n  Running 5 Physics Updates:", file=buf)
     for frame in range(1, 6):
         physics_system.update_physics(0.016)  # 60 FPS timestep
-        print(f"\n    Frame {frame}:")
-        print(f"      └─ Mass: {physics_system.mass:.4f}")
-        print(f"      └─ Energy: {physics_system.energy:.4f}")
-        print(f"      └─ Position Z: {obj.location.z:.4f}")
-        print(f"      └─ State: {[f'{x:.2f}' for x in physics_system.state]}")
+        print(f"\n    Frame {frame}:", file=buf)
+        print(f"      └─ Mass: {physics_system.mass:.4f}", file=buf)
+        print(f"      └─ Energy: {physics_system.energy:.4f}", file=buf)
+        print(f"      └─ Position Z: {obj.location[2]:.4f}", file=buf)
+        print(f"      └─ State: {[f'{x:.2f}' for x in physics_system.state]}", file=buf)
+    
+    sys.stdout.write(buf.getvalue())
 
 
 def test_parallel_processing():
     """Test parallel physics processing with threading"""
-    print_section("TEST 12: PARALLEL PHYSICS PROCESSING")
-    
-    class PhysicsObject:
-        def __init__(self, name):
-            self.name = name
-            self.location = type('obj', (object,), {'x': 0, 'y': 0, 'z': 0})()
-            self.velocity = [0, 0, 0]
+    buf = io.StringIO()  # Flushed to stdout in one write at the end
+    print_section("TEST 12: PARALLEL PHYSICS PROCESSING", file=buf)
+    
+    class PhysicsObjectsSoA:
+        """Structure-of-arrays container: one array per attribute, one slot per object"""
+        def __init__(self, names, pos_z=None, vel_z=None):
+            self.names = names
+            self.pos_z = np.zeros(len(names)) if pos_z is None else pos_z
+            self.vel_z = np.zeros(len(names)) if vel_z is None else vel_z
+        
+        def shards(self, n_shards):
+            """Split into index-range views so each processor thread owns one slice"""
+            bounds = np.linspace(0, len(self.names), n_shards + 1).astype(int)
+            return [PhysicsObjectsSoA(self.names[lo:hi], self.pos_z[lo:hi], self.vel_z[lo:hi])
+                    for lo, hi in zip(bounds[:-1], bounds[1:])]
         
         def update_physics(self, timestep):
-            self.location.z += 0.1 * timestep
-            self.velocity[2] += 0.05 * timestep
+            # Advances every object in the slice with one vector op per attribute
+            self.pos_z += 0.1 * timestep
+            self.vel_z += 0.05 * timestep
     
-    objects = [PhysicsObject(f"Object_{i}") for i in range(3)]
-    processor = ParallelPhysicsProcessor(objects)
+    objects = PhysicsObjectsSoA([f"Object_{i}" for i in range(3)])
+    shards = objects.shards(3)
+    processor = ParallelPhysicsProcessor(shards)
     
-    print(f"  Created {len(objects)} physics objects")
-    print(f"  Processing in parallel threads...")
+    print(f"  Created {len(objects.names)} physics objects", file=buf)
+    print(f"  Processing in {len(shards)} parallel threads "
+          f"(objects per thread: {[len(shard.names) for shard in shards]})...", file=buf)
     
     for frame in range(3):
         processor.process_all(0.016)
-        print(f"\n    Frame {frame + 1}:")
-        for obj in objects:
-            print(f"      {obj.name} - Z: {obj.location.z:.4f}, VZ: {obj.velocity[2]:.4f}")
+        print(f"\n    Frame {frame + 1}:", file=buf)
+        for name, z, vz in zip(objects.names, objects.pos_z, objects.vel_z):
+            print(f"      {name} - Z: {z:.4f}, VZ: {vz:.4f}", file=buf)
+    
+    sys.stdout.write(buf.getvalue())
+
+
+def test_quantum_rollout_consistency():
+    """Check the batched quantum_rollout kernel against update_physics"""
+    print_section("TEST 13: QUANTUM ROLLOUT KERNEL CONSISTENCY")
+    
+    class MockObject:
+        def __init__(self):
+            self.location = np.zeros(3)  # x, y, z
+    
+    initial_masses = np.array([1.0, 10.0, 25.0])
+    initial_energies = np.array([10.0, 50.0, 5.0])
+    n_systems, n_frames, time_delta = len(initial_masses), 10, 0.016
+    # Fixed user inputs so both paths see identical forces
+    inputs = np.random.default_rng(0).uniform(-1, 1, (n_systems, n_frames, 3))
+    
+    # Reference histories (mass, energy, position z, state[0]) from update_physics
+    expected = np.empty((4, n_systems, n_frames))
+    for b in range(n_systems):
+        obj = MockObject()
+        physics_system = QuantumPhysicsImprovement(obj, mass=initial_masses[b], energy=initial_energies[b])
+        for t in range(n_frames):
+            physics_system.get_user_input = lambda vec=inputs[b, t]: list(vec)
+            physics_system.update_physics(time_delta)
+            expected[:, b, t] = (physics_system.mass, physics_system.energy,
+                                 obj.location[2], physics_system.state[0])
+    
+    history = np.empty((4, n_systems, n_frames))
+    forces = np.abs(inputs).sum(axis=2)
+    quantum_rollout(initial_masses.copy(), initial_energies.copy(), np.ones((n_systems, 3)),
+                    np.zeros(n_systems), forces, time_delta, *history)
+    
+    max_error = np.max(np.abs(history - expected) / np.abs(expected))
+    print(f"  Systems: {n_systems}, Frames: {n_frames}")
+    print(f"  Max relative error vs update_physics: {max_error:.2e}")
+    assert np.allclose(history, expected, rtol=1e-12, atol=0)
 
 
 def main():
@@ -263,9 +309,10 @@ def main():
         test_user_interaction_force()
         test_quantum_physics_integration()
         test_parallel_processing()
+        test_quantum_rollout_consistency()
         
         print_section("ALL TESTS COMPLETED SUCCESSFULLY ✅")
-        print("\n  Total tests run: 12")
+        print("\n  Total tests run: 13")
         print("  Status: PASSED\n")
         
     except Exception as e: